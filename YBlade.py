@@ -2,7 +2,8 @@
 #Description-Import QBlade wind turbine blade designs into Fusion 360. Supports QBlade v0.963 and CE v2.x formats.
 
 import adsk.core, adsk.fusion, adsk.cam, traceback
-from adsk.core import Point3D, Vector3D, Matrix3D
+from adsk.core import Point3D
+import bisect
 import math
 import sys 
 import os
@@ -12,6 +13,12 @@ sys.stderr = sys.stdout
 sys.stdout.flush()
 
 profile_cache = {}
+rotation_cache = {}
+
+
+def clear_caches():
+    """Drop per-import geometry caches; parsed airfoils stay in profile_cache."""
+    rotation_cache.clear()
 
 
 def append_status(inputs, message):
@@ -33,14 +40,22 @@ def open_file_dialog(ui, title, file_filter='*.*'):
 
 
 def loadProfile(profilePath):
+    try:
+        stat = os.stat(profilePath)
+    except OSError as err:
+        raise RuntimeError(f'Failed to read airfoil file: {err}')
+
+    # Check modification time and size so an edited airfoil is re-read and
+    # replaces its old entry
     cached = profile_cache.get(profilePath)
-    if cached:
-        return cached
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
 
     points = []
     try:
         with open(profilePath, 'r') as profileFile:
-            for l in profileFile.readlines()[1:]:
+            next(profileFile, None)  # Skip the airfoil name
+            for l in profileFile:
                 tokens = l.split()
                 if len(tokens) < 2:
                     continue
@@ -54,34 +69,54 @@ def loadProfile(profilePath):
     if not points:
         raise RuntimeError('Airfoil file contained no coordinate data.')
 
-    profile_cache[profilePath] = points
+    # The cached profile is shared by every section and every later import,
+    # so store it immutable
+    points = tuple(points)
+    profile_cache[profilePath] = (stat.st_mtime_ns, stat.st_size, points)
     return points
 
-class Struct(object): pass
+class BladeSection(object):
+    __slots__ = ('pos', 'len', 'twist', 'offset', 'thread', 'profile')
+
+    def __init__(self):
+        self.profile = None
+
+# Columns holding POS, CHORD, TWIST, OFFSET and THREAD in each file format:
+#   old: POS CHORD TWIST OFFSET THREAD
+#   new: POS CHORD TWIST OFFSET_X OFFSET_Y P_AXIS POLAR_FILE (OFFSET_Y is the offset)
+OLD_FORMAT_COLUMNS = (0, 1, 2, 3, 4)
+NEW_FORMAT_COLUMNS = (0, 1, 2, 4, 5)
+# Lengths are given in meters, sketches are built in cm
+SECTION_SCALES = (100, 100, 1, 100, 1)
 
 def readBlade(bladeFile):
     sections = []
-    lines = bladeFile.readlines()
-    
-    # Detect file format
+
+    # Detect the file format while streaming: old files have 3 header lines
+    # followed by data, new files have a "Blade Data" block whose rows start
+    # after the "POS_[m]" header line
     isNewFormat = False
-    dataStartLine = 3  # Default for old format
-    
-    for i, line in enumerate(lines):
-        if "Blade Data" in line:
-            isNewFormat = True
-            # Skip past the header line with "POS_[m]"
-            for j in range(i + 1, len(lines)):
-                if "POS_[m]" in lines[j]:
-                    dataStartLine = j + 1  # Start after the header
-                    break
-            break
-    
-    # Parse based on format
+    inData = False
+    columns = OLD_FORMAT_COLUMNS
     profileCounts = {}  # Track which profile is used most
     mainProfile = None  # The profile we'll use (most common non-circular)
-    
-    for l in lines[dataStartLine:]:
+
+    for i, l in enumerate(bladeFile):
+        if not isNewFormat and "Blade Data" in l:
+            isNewFormat = True
+            inData = False
+            columns = NEW_FORMAT_COLUMNS
+            # Anything parsed so far was header text read as old-format data
+            sections = []
+            continue
+        if not inData:
+            if isNewFormat:
+                inData = "POS_[m]" in l
+                continue
+            if i < 3:
+                continue
+            inData = True
+
         stripped = l.strip()
         if not stripped or stripped.startswith("-"):
             continue
@@ -91,28 +126,19 @@ def readBlade(bladeFile):
             continue
             
         try:
-            s = Struct()
-            s.pos = float(x[0]) * 100  # Convert to cm
-            s.len = float(x[1]) * 100  # Convert to cm 
-            s.twist = float(x[2])
-            
+            s = BladeSection()
+            s.pos, s.len, s.twist, s.offset, s.thread = [
+                float(x[c]) * scale for c, scale in zip(columns, SECTION_SCALES)]
+
             if isNewFormat:
-                # New format: POS CHORD TWIST OFFSET_X OFFSET_Y P_AXIS POLAR_FILE
-                # OFFSET_Y is used as offset
-                s.offset = float(x[4]) * 100  # Convert to cm
-                s.thread = float(x[5])
-                
                 # Track profile usage
                 if len(x) > 6:
                     profile = x[6]
                     # Skip circular profiles - we want the main airfoil
-                    if "Circular" not in profile and "circular" not in profile:
+                    if 'circular' not in profile.lower():
                         profileCounts[profile] = profileCounts.get(profile, 0) + 1
                     s.profile = profile
             else:
-                # Old format: POS CHORD TWIST OFFSET THREAD
-                s.offset = float(x[3]) * 100  # Convert to cm
-                s.thread = float(x[4])
                 s.profile = "default"
             
             sections.append(s)
@@ -123,67 +149,144 @@ def readBlade(bladeFile):
     if profileCounts:
         mainProfile = max(profileCounts, key=profileCounts.get)
     
-    # Filter out sections that don't use the main profile
+    # Filter out circular sections; profileCounts holds exactly the
+    # non-circular profiles, the main one included
     if mainProfile:
-        sections = [s for s in sections if hasattr(s, 'profile') and 
-                   (s.profile == mainProfile or "Circular" not in s.profile)]
+        sections = [s for s in sections if s.profile in profileCounts]
     
     return sections
 
-def findClosest(target, l):
-    """
-    Find value in l closest target. Return index of such a value
-    """
-    minVal = l[0]
-    minIdx = 0
-    for i, e in enumerate(l):
-        if abs(target - minVal) > abs(target - e):
-            minVal = e
-            minIdx = i
-    return minIdx
-
 def deduceOffset(blade, profile):
-    positives = list([(x, y) for x, y in profile if y > 0])
-    posIdx = findClosest(blade[0].thread, [x for x, y in positives])
-    negatives = list([(x, y) for x, y in profile if y < 0])
-    negIdx = findClosest(blade[0].thread, [x for x, y in negatives])
-
-    mid = (positives[posIdx][1] + negatives[negIdx][1]) / 2
+    # Center the section on the airfoil's mid-line at the thread axis: take the
+    # upper and lower surface points closest to it in x
+    thread = blade[0].thread
+    upper = min((p for p in profile if p[1] > 0), key=lambda p: abs(thread - p[0]), default=None)
+    if upper is None:
+        raise RuntimeError('Airfoil file contained no upper surface points.')
+    lower = min((p for p in profile if p[1] < 0), key=lambda p: abs(thread - p[0]), default=None)
+    if lower is None:
+        raise RuntimeError('Airfoil file contained no lower surface points.')
+
+    mid = (upper[1] + lower[1]) / 2
 
     for b in blade:
         b.offset = -mid * b.len
 
-def profilePoints(profileData, chordLength, twist, threadAxisOffset, zoffset):
-    pointSet = adsk.core.ObjectCollection.create()
-    for profilePoint in profileData:
-        p = Point3D.create(profilePoint[0] * chordLength, profilePoint[1] * chordLength, 0)
-        p.translateBy(Vector3D.create(-chordLength * threadAxisOffset, zoffset))
-        m = Matrix3D.create()
-        m.setToRotation(math.radians(twist), Vector3D.create(0, 0, 1), Point3D.create(0, 0, 0))
-        p.transformBy(m)
-        pointSet.add(p)
-    return pointSet
-
-def drawProfile(sketch, profileData, chordLength, twist, threadAxisOffset, zoffset):
-    pointSet = profilePoints(profileData, chordLength, twist, threadAxisOffset, zoffset)
-    spline = sketch.sketchCurves.sketchFittedSplines.add(pointSet)
-    first, last = pointSet.item(0), pointSet.item(pointSet.count - 1)
-    line = sketch.sketchCurves.sketchLines.addByTwoPoints(first, last)
-    profile = adsk.core.ObjectCollection.create()
-    profile.add(spline)
-    profile.add(line)
-    return profile
+def selectSections(blade, maxSections=None):
+    """
+    Return indices of the blade sections that get a profile sketch. A section
+    is skipped when its chord and twist are within 1 cm and 1 degree of the
+    previously kept one; the tip section is always kept. If more than
+    maxSections remain, they are resampled evenly along the span; 0 or None
+    keeps every section and 1 is treated as 2 (root and tip).
+    """
+    indices = []
+    prevLen = -1000
+    prevTwist = -1000
+    last = len(blade) - 1
+    for i, b in enumerate(blade):
+        if abs(b.len - prevLen) < 1 and abs(b.twist - prevTwist) < 1 and i != last:
+            continue
+        prevLen = b.len
+        prevTwist = b.twist
+        indices.append(i)
+    if maxSections and len(indices) > maxSections:
+        indices = resampleSections(blade, indices, maxSections)
+    return indices
+
+def resampleSections(blade, indices, count):
+    """
+    Pick min(count, len(indices)) of the given section indices, spread evenly
+    along the blade span. The root and tip sections are always kept; each
+    other target position takes the nearest section not picked yet, so
+    unevenly spaced sections still fill the requested count.
+    """
+    positions = [blade[i].pos for i in indices]
+    last = len(indices) - 1
+    count = max(2, min(count, len(indices)))
+    start, end = positions[0], positions[-1]
+    picked = {0, last}
+    for k in range(1, count - 1):
+        target = start + (end - start) * k / (count - 1)
+        hi = bisect.bisect_left(positions, target)
+        lo = hi - 1
+        while lo >= 0 and lo in picked:
+            lo -= 1
+        while hi <= last and hi in picked:
+            hi += 1
+        if hi > last or (lo >= 0 and target - positions[lo] <= positions[hi] - target):
+            picked.add(lo)
+        else:
+            picked.add(hi)
+    return [indices[j] for j in sorted(picked)]
+
+def twistRotation(twist):
+    """
+    Return (cos, sin) of a twist angle given in degrees. Sections often share
+    the same twist, so the values are cached per angle.
+    """
+    key = round(twist, 9)
+    cached = rotation_cache.get(key)
+    if cached is None:
+        angle = math.radians(twist)
+        cached = (math.cos(angle), math.sin(angle))
+        rotation_cache[key] = cached
+    return cached
+
+def profileCoordinates(profileData, chordLength, twist, threadAxisOffset, zoffset):
+    """
+    Scale, shift and twist the airfoil into sketch coordinates of a section.
+    Returns a list of (x, y) tuples.
+    """
+    # The twist is constant for the whole section, so fold the chord scaling,
+    # the shift and the rotation into one affine map computed up front.
+    c, s = twistRotation(twist)
+    dx = -chordLength * threadAxisOffset
+    a, b = c * chordLength, s * chordLength
+    ex, ey = c * dx - s * zoffset, s * dx + c * zoffset
+    return [(a * px - b * py + ex, b * px + a * py + ey) for px, py in profileData]
+
+def objectCollection(items):
+    """
+    Build an ObjectCollection from a list. Uses createWithArray when the
+    running Fusion version provides it, otherwise adds the items one by one.
+    """
+    createWithArray = getattr(adsk.core.ObjectCollection, 'createWithArray', None)
+    if createWithArray:
+        return createWithArray(items)
+    collection = adsk.core.ObjectCollection.create()
+    add = collection.add
+    for item in items:
+        add(item)
+    return collection
+
+def profilePoints(coordinates):
+    create = Point3D.create
+    return [create(x, y, 0) for x, y in coordinates]
+
+def drawProfile(sketch, coordinates):
+    # Keep the points in a Python list so the spline ends can be read back
+    # without going through ObjectCollection.item()
+    points = profilePoints(coordinates)
+    pointSet = objectCollection(points)
+    # Let Fusion solve the sketch once after both curves exist
+    sketch.isComputeDeferred = True
+    try:
+        spline = sketch.sketchCurves.sketchFittedSplines.add(pointSet)
+        line = sketch.sketchCurves.sketchLines.addByTwoPoints(points[0], points[-1])
+    finally:
+        sketch.isComputeDeferred = False
+    return objectCollection([spline, line])
 
 def drawGuideLine(sketch, blade, seed):
-    pointSet = adsk.core.ObjectCollection.create() 
+    points = []
+    add, create = points.append, Point3D.create
     for s in blade:
-        p = Point3D.create(seed[0] * s.len, seed[1] * s.len, s.pos)
-        p.translateBy(Vector3D.create(-s.len * s.thread, s.offset))
-        m = Matrix3D.create()
-        m.setToRotation(math.radians(s.twist), Vector3D.create(0, 0, 1), Point3D.create(0, 0, 0))
-        p.transformBy(m)
-        pointSet.add(p)
-    spline = sketch.sketchCurves.sketchFittedSplines.add(pointSet)
+        c, sn = twistRotation(s.twist)
+        x = seed[0] * s.len - s.len * s.thread
+        y = seed[1] * s.len + s.offset
+        add(create(c * x - sn * y, sn * x + c * y, s.pos))
+    spline = sketch.sketchCurves.sketchFittedSplines.add(objectCollection(points))
     return spline
 
 def drawSpline(sketch, points):
@@ -237,7 +340,9 @@ def run(context):
                     blade_path = inputs.itemById('bladePath').value.strip()
                     remove_hub = inputs.itemById('removeHubRadius').value
                     center_mass = inputs.itemById('centerMass').value
+                    max_sections = inputs.itemById('maxSections').value
                     append_status(inputs, 'Starting import...')
+                    clear_caches()
 
                     if not profile_path or not blade_path:
                         raise RuntimeError('Select both airfoil and blade files before running the import.')
@@ -273,27 +378,23 @@ def run(context):
                             b.pos -= hubOffset
                         append_status(inputs, f'Hub offset removed ({hubOffset:.2f} cm).')
 
+                    sectionIndices = selectSections(blade, max_sections)
+
                     progressDialog.progressValue = 2
-                    progressDialog.message = f'Creating {len(blade)} blade profiles...'
+                    progressDialog.message = f'Creating {len(sectionIndices)} blade profiles...'
 
                     timelineGroups = design.timeline.timelineGroups
                     groupStartIndex = design.timeline.markerPosition
 
                     profiles = []
-                    prevLen = -1000
-                    prevTwist = -1000
                     successfulBladeData = []
 
-                    for i, b in enumerate(blade):
-                        if abs(b.len - prevLen) < 1 and abs(b.twist - prevTwist) < 1 and i != len(blade) - 1:
-                            continue
-                        prevLen = b.len
-                        prevTwist = b.twist
-
+                    for n, i in enumerate(sectionIndices):
+                        b = blade[i]
                         if len(profiles) % 5 == 0:
-                            progress = 2 + int((i / max(1, len(blade))) * 5)
+                            progress = 2 + int((n / len(sectionIndices)) * 5)
                             progressDialog.progressValue = progress
-                            progressDialog.message = f'Creating profiles... {len(profiles)}/{len(blade)}'
+                            progressDialog.message = f'Creating profiles... {len(profiles)}/{len(sectionIndices)}'
 
                         planeInput = planes.createInput()
                         offsetValue = adsk.core.ValueInput.createByReal(b.pos)
@@ -302,7 +403,8 @@ def run(context):
                         plane.name = f"profile_{i}"
                         profileSketch = sketches.add(plane)
                         profileSketch.isLightBulbOn = False
-                        drawProfile(profileSketch, profileData, b.len, b.twist, b.thread, b.offset)
+                        coordinates = profileCoordinates(profileData, b.len, b.twist, b.thread, b.offset)
+                        drawProfile(profileSketch, coordinates)
 
                         profiles.append(profileSketch)
                         successfulBladeData.append(b)
@@ -316,10 +418,14 @@ def run(context):
                     progressDialog.message = 'Building blade shell...'
 
                     guideSketch = sketches.add(xyPlane)
-                    guideLine1 = drawGuideLine(guideSketch, successfulBladeData, (0, 0))
-                    sweepLine = guideSketch.sketchCurves.sketchLines.addByTwoPoints(
-                        Point3D.create(0, 0, blade[0].pos),
-                        Point3D.create(0, 0, blade[-1].pos))
+                    guideSketch.isComputeDeferred = True
+                    try:
+                        guideLine1 = drawGuideLine(guideSketch, successfulBladeData, (0, 0))
+                        sweepLine = guideSketch.sketchCurves.sketchLines.addByTwoPoints(
+                            Point3D.create(0, 0, blade[0].pos),
+                            Point3D.create(0, 0, blade[-1].pos))
+                    finally:
+                        guideSketch.isComputeDeferred = False
 
                     progressDialog.progressValue = 8
                     progressDialog.message = 'Building blade...'
@@ -338,10 +444,8 @@ def run(context):
 
                     allBodies = rootComp.bRepBodies
                     bodyCountAfter = allBodies.count
-                    newBodies = []
-                    if bodyCountAfter > bodyCountBefore:
-                        for i in range(bodyCountBefore, bodyCountAfter):
-                            newBodies.append(allBodies.item(i))
+                    item = allBodies.item
+                    newBodies = [item(i) for i in range(bodyCountBefore, bodyCountAfter)]
 
                     if center_mass and newBodies:
                         progressDialog.message = 'Centering blade by center of mass...'
@@ -356,17 +460,13 @@ def run(context):
                             totalMass += mass
                             weightedComX += com.x * mass
                             weightedComY += com.y * mass
-                            bbox = body.boundingBox
-                            if bbox.minPoint.z < minZ:
-                                minZ = bbox.minPoint.z
+                            minZ = min(minZ, body.boundingBox.minPoint.z)
 
                         if totalMass > 0:
                             comX = weightedComX / totalMass
                             comY = weightedComY / totalMass
                             moveFeats = rootComp.features.moveFeatures
-                            bodiesToMove = adsk.core.ObjectCollection.create()
-                            for body in newBodies:
-                                bodiesToMove.add(body)
+                            bodiesToMove = objectCollection(newBodies)
                             transform = adsk.core.Matrix3D.create()
                             transform.translation = adsk.core.Vector3D.create(-comX, -comY, -minZ)
                             moveInput = moveFeats.createInput(bodiesToMove, transform)
@@ -451,6 +551,8 @@ def run(context):
 
                     inputs.addBoolValueInput('removeHubRadius', 'Start blade at Z=0', True, '', True)
                     inputs.addBoolValueInput('centerMass', 'Center mass to origin', True, '', False)
+                    maxSectionsInput = inputs.addIntegerSpinnerCommandInput('maxSections', 'Max profile sections', 0, 1000, 1, 0)
+                    maxSectionsInput.tooltip = '0 keeps every section; values below 2 build root and tip only. Lower values import faster but follow the blade shape more coarsely.'
 
                     statusBox = inputs.addTextBoxCommandInput('statusLog', 'Status', 'Ready', 6, True)
                     statusBox.isFullWidth = True